@@ -1,4 +1,4 @@
-from .downloader import download
+from .downloader import DownloaderService, download
 
-__all__ = ["download"]
+__all__ = ["download", "DownloaderService"]
 __version__ = "2.1.0-beta.1"
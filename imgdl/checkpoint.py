@@ -0,0 +1,118 @@
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Set
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a download job over a stream of input records.
+
+    Records are identified by their position in the input. Every record
+    before ``offset`` has been processed, while ``done`` holds the
+    processed records after ``offset`` that completed out of order.
+    Failed records count as processed. They are appended to a JSON lines
+    file next to the checkpoint, ``failures_path``, so that the size of
+    the checkpoint does not grow with the number of failures.
+
+    Parameters
+    ----------
+    path : Path
+        File where the checkpoint is stored
+    source : str
+        Input the checkpoint refers to
+    offset : int
+        Number of leading input records that have been processed
+    done : set
+        Processed record positions greater than ``offset``
+    n_failed : int
+        Number of failed records
+    """
+
+    path: Path
+    source: Optional[str] = None
+    offset: int = 0
+    done: Set[int] = field(default_factory=set)
+    n_failed: int = 0
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        # Failures not yet written to failures_path
+        self.pending_failures = []
+
+    @property
+    def failures_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".failed.jsonl")
+
+    def is_done(self, index: int) -> bool:
+        return index < self.offset or index in self.done
+
+    def mark(self, index: int, url: str, success: bool = True):
+        """Record the outcome of the record at position ``index``."""
+        if self.is_done(index):
+            return
+        if not success:
+            self.pending_failures.append({"index": index, "url": url})
+            self.n_failed += 1
+        self.done.add(index)
+        while self.offset in self.done:
+            self.done.remove(self.offset)
+            self.offset += 1
+
+    def save(self):
+        """Atomically write the checkpoint to ``path``.
+
+        New failures are first appended to ``failures_path``. The state is
+        then written to a temporary file which replaces the previous
+        checkpoint, so a killed job never leaves a partial file. If the job
+        is killed between both writes, the failures since the previous
+        checkpoint are processed, and listed, again on resume.
+        """
+        if self.pending_failures:
+            with open(self.failures_path, "a") as f:
+                for failure in self.pending_failures:
+                    f.write(json.dumps(failure) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending_failures = []
+
+        state = {
+            "source": self.source,
+            "offset": self.offset,
+            "done": sorted(self.done),
+            "n_failed": self.n_failed,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def failures(self):
+        """Yield the ``{"index": int, "url": str}`` records that failed."""
+        if self.failures_path.exists():
+            with open(self.failures_path) as f:
+                for line in f:
+                    yield json.loads(line)
+        yield from self.pending_failures
+
+    def clear(self):
+        """Remove the failures recorded by a previous run."""
+        self.failures_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path):
+        """Load a checkpoint, or start an empty one if ``path`` is missing."""
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path)
+        state = json.loads(path.read_text())
+        return cls(
+            path=path,
+            source=state.get("source"),
+            offset=state["offset"],
+            done=set(state["done"]),
+            n_failed=state["n_failed"],
+        )
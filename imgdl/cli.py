@@ -1,8 +1,14 @@
 import argparse
+from itertools import islice
 from pathlib import Path
 
-from . import download
+from .checkpoint import Checkpoint
+from .downloader import ImageDownloader
+from .inputs import read_records
+from .manifest import Manifest
 from .settings import config
+from .storage.backend import resolve_storage_backend
+from .transport import resolve_session
 
 
 def parse(args=None):
@@ -12,7 +18,33 @@ def parse(args=None):
     )
 
     parser.add_argument(
-        "urls", type=str, help="Text file with the list of urls to be downloaded"
+        "urls",
+        type=str,
+        help="File with the list of urls to be downloaded. Plain text, csv "
+        "and jsonl files are supported, optionally gzip or zstd compressed",
+    )
+
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="auto",
+        choices=["auto", "txt", "csv", "jsonl"],
+        help="Format of the urls file. 'auto' infers it from the extension",
+    )
+
+    parser.add_argument(
+        "--url_column",
+        type=str,
+        default="url",
+        help="Column (csv) or key (jsonl) holding the urls",
+    )
+
+    parser.add_argument(
+        "--path_column",
+        type=str,
+        default="path",
+        help="Optional column (csv) or key (jsonl) holding the paths where "
+        "images should be stored",
     )
 
     parser.add_argument(
@@ -51,6 +83,37 @@ def parse(args=None):
         help="Maximum wait time between image downloads",
     )
 
+    parser.add_argument(
+        "--min_size",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("WIDTH", "HEIGHT"),
+        help="Reject images smaller than the given size",
+    )
+
+    parser.add_argument(
+        "--formats",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Allowed image formats, e.g. JPEG PNG. All formats if not given",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="JSON lines file where the path and metadata (width, height, "
+        "bytes, format) of each stored image are appended",
+    )
+
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use the HTTP/2 transport (requires httpx[http2])",
+    )
+
     parser.add_argument(
         "-f",
         "--force",
@@ -58,20 +121,104 @@ def parse(args=None):
         help="Force the download even if the files already exists",
     )
 
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="File where progress is recorded. Defaults to '{urls}.checkpoint.json'",
+    )
+
+    parser.add_argument(
+        "--checkpoint_every",
+        type=int,
+        default=1000,
+        help="Number of processed images between checkpoint writes",
+    )
+
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=10000,
+        help="Number of urls read from the input and scheduled at once",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume from the checkpoint, skipping urls already processed. "
+        "Failed urls count as processed and are not retried; they are listed "
+        "in '{checkpoint}.failed.jsonl'",
+    )
+
     args = parser.parse_args(args)
 
     return args
 
 
+def chunked(iterable, size):
+    """Split an iterable in lists of at most ``size`` elements."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 def main(args=None):
     args = parse(args)
-    urls = Path(args.urls).read_text().strip().split()
-    _ = download(
-        urls,
-        store_path=args.store_path,
+    source = str(Path(args.urls).resolve())
+    checkpoint_path = args.checkpoint or f"{args.urls}.checkpoint.json"
+    if args.resume:
+        checkpoint = Checkpoint.load(checkpoint_path)
+        if checkpoint.source not in (None, source):
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} was created for {checkpoint.source}"
+            )
+    else:
+        checkpoint = Checkpoint(path=checkpoint_path)
+        checkpoint.clear()
+    checkpoint.source = source
+
+    session = resolve_session(http2=args.http2, n_workers=args.n_workers)
+    downloader = ImageDownloader(
+        storage=resolve_storage_backend(store_path=args.store_path),
         n_workers=args.n_workers,
         timeout=args.timeout,
         min_wait=args.min_wait,
         max_wait=args.max_wait,
-        force=args.force,
+        session=session,
+        min_size=tuple(args.min_size) if args.min_size else None,
+        formats=tuple(args.formats) if args.formats else None,
+        manifest=Manifest(args.manifest) if args.manifest else None,
     )
+
+    records = read_records(
+        args.urls,
+        fmt=args.format,
+        url_column=args.url_column,
+        path_column=args.path_column,
+    )
+    pending = (
+        (i, url, path)
+        for i, (url, path) in enumerate(records)
+        if not checkpoint.is_done(i)
+    )
+
+    n_processed = 0
+    try:
+        for chunk in chunked(pending, args.chunk_size):
+            indices, urls, paths = zip(*chunk)
+
+            def callback(j, url, path):
+                nonlocal n_processed
+                checkpoint.mark(indices[j], url, success=path is not None)
+                n_processed += 1
+                if n_processed % args.checkpoint_every == 0:
+                    checkpoint.save()
+
+            downloader(
+                list(urls), paths=list(paths), force=args.force, callback=callback
+            )
+    finally:
+        checkpoint.save()
+        if downloader.manifest is not None:
+            downloader.manifest.close()
+        session.close()
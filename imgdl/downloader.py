@@ -1,16 +1,22 @@
 import random
+import threading
 from collections.abc import Iterable
 from concurrent import futures
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from io import BytesIO
 from time import sleep
+from typing import Optional, Tuple
 
 import requests
 from PIL import Image
 from tqdm.auto import tqdm
 
+from .manifest import Manifest
+from .scheduler import Batch, Scheduler
 from .settings import config, get_logger
 from .storage.backend import BaseStorage, resolve_storage_backend
+from .transport import resolve_session
+from .validation import inspect_image, validate_image
 
 logger = get_logger(__name__)
 
@@ -33,8 +39,15 @@ class ImageDownloader(object):
         Minimum wait time between image downloads
     max_wait : float
         Maximum wait time between image downloads
-    session : requests.Session
-        requests session
+    session : requests.Session | HTTP2Session
+        Session used for the url requests. See ``imgdl.transport``
+    min_size : tuple
+        Minimum ``(width, height)``. Smaller images are rejected
+    formats : tuple
+        Allowed PIL formats, e.g. ``("JPEG", "PNG")``. All if None
+    manifest : Manifest
+        If given, a record with the url, path and image metadata is
+        written for each processed image
     """
 
     storage: BaseStorage = resolve_storage_backend(config.STORE_PATH)
@@ -43,8 +56,11 @@ class ImageDownloader(object):
     min_wait: float = config.MIN_WAIT
     max_wait: float = config.MAX_WAIT
     session: requests.Session = requests.Session()
+    min_size: Optional[Tuple[int, int]] = None
+    formats: Optional[Tuple[str, ...]] = None
+    manifest: Optional[Manifest] = None
 
-    def __call__(self, urls, paths=None, force=False):
+    def __call__(self, urls, paths=None, force=False, callback=None):
         """Download url or list of urls
 
         Parameters
@@ -58,6 +74,10 @@ class ImageDownloader(object):
         force : bool
             If True force the download even if the files already exists
 
+        callback : callable
+            Called as ``callback(i, url, path)`` each time the i-th image
+            of an iterable is processed. ``path`` is None on failure
+
         Returns
         -------
         paths : str | list
@@ -92,6 +112,8 @@ class ImageDownloader(object):
                     paths[i] = str(future.result())
                 else:
                     n_fail += 1
+                if callback is not None:
+                    callback(i, url, paths[i])
 
             logger.warning(f"{n_fail} images failed to download")
 
@@ -103,6 +125,9 @@ class ImageDownloader(object):
         If the image path already exists, it considers that the file has
         already been downloaded and does not downloaded again.
 
+        Images are validated from their header (format, size, truncation)
+        before being decoded and converted.
+
 
         Parameters
         ----------
@@ -132,14 +157,25 @@ class ImageDownloader(object):
         if self.storage.exists(path) and not force:
             metadata.update({"success": True, "filepath": path})
             logger.info("On cache", extra=metadata)
+            self._write_manifest(metadata, cached=True)
             return path
         try:
 
             response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             orig_img = Image.open(BytesIO(response.content))
+            metadata["image"] = inspect_image(orig_img, response.content)
+            validate_image(
+                metadata["image"],
+                response.content,
+                min_size=self.min_size,
+                formats=self.formats,
+            )
             img = self.convert_image(orig_img)
-            self.storage.save(img, path)
+            metadata["stored"] = self.storage.save(img, path)
+            metadata["stored"].update(
+                {"mode": img.mode, "width": img.width, "height": img.height}
+            )
 
             metadata.update(
                 {
@@ -153,6 +189,7 @@ class ImageDownloader(object):
             )
 
             logger.info("Downloaded", extra=metadata)
+            self._write_manifest(metadata)
             sleep(random.uniform(self.min_wait, self.max_wait))
         except Exception as e:
             metadata.update(
@@ -174,9 +211,28 @@ class ImageDownloader(object):
                 )
 
             logger.error("Failed", extra=metadata)
+            self._write_manifest(metadata)
             raise e
         return path
 
+    def _write_manifest(self, metadata, cached=False):
+        if self.manifest is None:
+            return
+        record = {
+            "url": metadata["url"],
+            "path": metadata.get("filepath"),
+            "success": metadata["success"],
+            "cached": cached,
+        }
+        # Stored files are converted, so the source image is described apart
+        record.update(metadata.get("stored", {}))
+        record.update(
+            {f"source_{key}": value for key, value in metadata.get("image", {}).items()}
+        )
+        if "Exception" in metadata:
+            record["error"] = metadata["Exception"]["msg"]
+        self.manifest.write(record)
+
     def get(self, url):
         response = self.session.get(url, timeout=self.timeout)
         return Image.open(BytesIO(response.content))
@@ -218,6 +274,161 @@ class ImageDownloader(object):
         return img
 
 
+@dataclass
+class DownloaderService(object):
+    """Long-lived pool of workers shared by concurrent downloads.
+
+    Unlike :class:`ImageDownloader`, which creates a thread pool on every
+    call, the service keeps a single pool of workers and a single
+    downloader (hence a single ``requests.Session`` and connection pool)
+    for its whole life. Batches submitted from several threads are
+    interleaved by a :class:`~imgdl.scheduler.Scheduler` according to
+    their priority and deadline.
+
+    Parameters
+    ----------
+    downloader : ImageDownloader
+        Downloader used by the workers. Its ``n_workers`` sets the size of
+        the pool. Defaults to a downloader whose session keeps a connection
+        alive per worker
+    """
+
+    downloader: ImageDownloader = field(
+        default_factory=lambda: ImageDownloader(
+            session=resolve_session(n_workers=config.N_WORKERS)
+        )
+    )
+
+    def __post_init__(self):
+        self.scheduler = Scheduler()
+        self.workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(self.downloader.n_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(
+        self,
+        urls,
+        paths=None,
+        force=False,
+        priority=1.0,
+        deadline: Optional[float] = None,
+        callback=None,
+    ):
+        """Schedule a list of urls without waiting for them.
+
+        See :meth:`download` for the parameters.
+
+        Returns
+        -------
+        batch : Batch
+            Handle of the submitted batch. ``batch.result()`` waits for it
+            and returns the list of image paths
+        """
+        if isinstance(urls, str) or not isinstance(urls, Iterable):
+            raise ValueError("urls should be an iterable of str")
+
+        urls = list(urls)
+        paths = [None] * len(urls) if paths is None else list(paths)
+        batch = Batch(
+            urls=urls,
+            paths=paths,
+            force=force,
+            priority=priority,
+            deadline=deadline,
+            callback=callback,
+        )
+        return self.scheduler.submit(batch)
+
+    def download(
+        self,
+        urls,
+        paths=None,
+        force=False,
+        priority=1.0,
+        deadline: Optional[float] = None,
+    ):
+        """Download a list of urls and wait for them.
+
+        Parameters
+        ----------
+        urls : iterable
+            urls to be downloaded
+
+        paths : list
+            paths where the images should be stored
+
+        force : bool
+            If True force the download even if the files already exists
+
+        priority : float
+            Weight of the batch. Concurrent batches share the workers in
+            proportion to their priority
+
+        deadline : float
+            Seconds after which the images that have not started yet are
+            given up on and reported as failed
+
+        Returns
+        -------
+        paths : list
+            List of image paths. If image failed to download, None is
+            given instead of image path
+        """
+        if isinstance(urls, str) or not isinstance(urls, Iterable):
+            raise ValueError("urls should be an iterable of str")
+
+        urls = list(urls)
+        with tqdm(total=len(urls), miniters=1) as pbar:
+            batch = self.submit(
+                urls,
+                paths=paths,
+                force=force,
+                priority=priority,
+                deadline=deadline,
+                callback=lambda *_: pbar.update(),
+            )
+            paths = batch.result()
+
+        logger.warning(f"{batch.n_fail} images failed to download")
+        return paths
+
+    def close(self, wait=True):
+        """Stop the workers once every submitted batch is scheduled."""
+        self.scheduler.close()
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _work(self):
+        while (task := self.scheduler.get()) is not None:
+            batch, i = task
+            try:
+                path = str(
+                    self.downloader._download_image(
+                        batch.urls[i], batch.paths[i], batch.force
+                    )
+                )
+            except Exception:
+                path = None
+            try:
+                batch.set_result(i, path)
+            except Exception as e:
+                # A failing callback must not take down a shared worker
+                logger.error(
+                    "Callback failed",
+                    extra={"url": batch.urls[i], "Exception": {"msg": str(e)}},
+                )
+
+
 def download(
     urls,
     paths=None,
@@ -226,7 +437,11 @@ def download(
     timeout=config.TIMEOUT,
     min_wait=config.MIN_WAIT,
     max_wait=config.MAX_WAIT,
-    session=requests.Session(),
+    session=None,
+    http2=False,
+    min_size=None,
+    formats=None,
+    manifest=None,
     force=False,
 ):
     """Asynchronously download images using multiple threads.
@@ -247,6 +462,19 @@ def download(
         Minimum wait time between image downloads
     max_wait : float
         Maximum wait time between image downloads
+    session : requests.Session | HTTP2Session
+        Session used for the url requests. Defaults to a new session
+        with a connection pool sized for ``n_workers``
+    http2 : bool
+        If True and no session is given, use the HTTP/2 transport
+    min_size : tuple
+        Minimum ``(width, height)``. Smaller images are rejected
+    formats : list
+        Allowed PIL formats, e.g. ``["JPEG", "PNG"]``. All if None
+    manifest : str
+        Path of a JSON lines file where the url, path and metadata
+        (width, height, bytes, format) of each stored image are appended,
+        along with the metadata of the downloaded image
     force : bool
         If True force the download even if the files already exists
 
@@ -258,6 +486,10 @@ def download(
         image failed to download, None is given instead of image path
     """
 
+    own_session = session is None
+    if own_session:
+        session = resolve_session(http2=http2, n_workers=n_workers)
+
     downloader = ImageDownloader(
         storage=resolve_storage_backend(store_path=store_path),
         n_workers=n_workers,
@@ -265,6 +497,15 @@ def download(
         min_wait=min_wait,
         max_wait=max_wait,
         session=session,
+        min_size=min_size,
+        formats=formats,
+        manifest=Manifest(manifest) if manifest is not None else None,
     )
 
-    return downloader(urls, paths=paths, force=force)
+    try:
+        return downloader(urls, paths=paths, force=force)
+    finally:
+        if downloader.manifest is not None:
+            downloader.manifest.close()
+        if own_session:
+            session.close()
@@ -0,0 +1,251 @@
+import asyncio
+import socket
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+import anyio
+import httpcore
+import httpx
+
+from .settings import config
+
+
+class DNSCache:
+    """Thread safe cache of ``getaddrinfo`` results.
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds during which a resolved address is reused
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> list:
+        """Return the addresses of ``host``, resolving it if needed."""
+        now = monotonic()
+        with self._lock:
+            entry = self._cache.get((host, port))
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        addresses = [
+            info[4][0]
+            for info in socket.getaddrinfo(
+                host, port, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP
+            )
+        ]
+        with self._lock:
+            self._cache[(host, port)] = (now + self.ttl, addresses)
+        return addresses
+
+
+class CachingBackend(httpcore.AnyIOBackend):
+    """Network backend that caches DNS and counts opened connections."""
+
+    def __init__(self, dns_cache: DNSCache):
+        super().__init__()
+        self.dns_cache = dns_cache
+        self.connections_opened = 0
+
+    async def connect_tcp(self, host, port, timeout=None, **kwargs):
+        # TLS server name is given separately by httpcore, so connecting to
+        # the resolved address does not break certificate verification
+        try:
+            addresses = await anyio.to_thread.run_sync(
+                self.dns_cache.resolve, host, port
+            )
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        for i, address in enumerate(addresses):
+            try:
+                stream = await super().connect_tcp(
+                    address, port, timeout=timeout, **kwargs
+                )
+                break
+            except httpcore.ConnectError:
+                if i == len(addresses) - 1:
+                    raise
+
+        # Connections are only opened from the event loop thread
+        self.connections_opened += 1
+        return stream
+
+
+# httpcore and httpx share exception names, httpx ones being the public API
+_EXCEPTIONS = {
+    getattr(httpcore, name): getattr(httpx, name)
+    for name in [
+        "ConnectTimeout",
+        "ReadTimeout",
+        "WriteTimeout",
+        "PoolTimeout",
+        "TimeoutException",
+        "ConnectError",
+        "ReadError",
+        "WriteError",
+        "NetworkError",
+        "RemoteProtocolError",
+        "LocalProtocolError",
+        "ProtocolError",
+        "UnsupportedProtocol",
+        "ProxyError",
+    ]
+}
+
+
+@contextmanager
+def map_exceptions():
+    """Raise httpx exceptions instead of httpcore ones."""
+    try:
+        yield
+    except Exception as exc:
+        for exc_type in type(exc).__mro__:
+            if exc_type in _EXCEPTIONS:
+                raise _EXCEPTIONS[exc_type](str(exc)) from exc
+        raise
+
+
+class ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        with map_exceptions():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self):
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class HTTP2Transport(httpx.AsyncBaseTransport):
+    """httpx transport over an HTTP/2 capable ``httpcore`` connection pool.
+
+    Parameters
+    ----------
+    network_backend : CachingBackend
+        Backend used to open connections
+    max_connections : int
+        Maximum number of simultaneous connections
+    http1 : bool
+        If False, talk HTTP/2 to every server, including plain ``http://``
+        urls (HTTP/2 with prior knowledge, a.k.a. h2c)
+    """
+
+    def __init__(
+        self,
+        network_backend: CachingBackend,
+        max_connections: int = config.N_WORKERS,
+        http1: bool = True,
+    ):
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            http1=http1,
+            http2=True,
+            network_backend=network_backend,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        req = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with map_exceptions():
+            resp = await self.pool.handle_async_request(req)
+
+        return httpx.Response(
+            status_code=resp.status,
+            headers=resp.headers,
+            stream=ResponseStream(resp.stream),
+            extensions=resp.extensions,
+        )
+
+    async def aclose(self):
+        await self.pool.aclose()
+
+
+class HTTP2Session:
+    """HTTP/2 capable session for CDN heavy workloads.
+
+    Requests to the same host are multiplexed over a few long lived
+    HTTP/2 connections instead of one TCP/TLS connection per worker.
+    Servers without HTTP/2 support are reached with keep-alive HTTP/1.1.
+    All connections share a single TLS context and a DNS cache.
+
+    The connections are driven by an event loop running in a background
+    thread, while ``get`` blocks the calling thread as ``requests`` does.
+    Sharing one HTTP/2 connection between threads is not safe with the
+    synchronous ``httpcore`` API, which may send stream ids out of order.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of simultaneous threads that will share the session
+    dns_ttl : float
+        Seconds during which resolved hostnames are reused
+    http1 : bool
+        If False, use HTTP/2 with prior knowledge, also on plain
+        ``http://`` urls. Only for servers known to speak HTTP/2
+    """
+
+    def __init__(
+        self,
+        n_workers: int = config.N_WORKERS,
+        dns_ttl: float = 300.0,
+        http1: bool = True,
+    ):
+        self.network_backend = CachingBackend(DNSCache(ttl=dns_ttl))
+        transport = HTTP2Transport(
+            self.network_backend, max_connections=n_workers, http1=http1
+        )
+        self.client = httpx.AsyncClient(transport=transport, follow_redirects=True)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self.client.headers
+
+    @property
+    def connections_opened(self) -> int:
+        """Number of connections opened since the session was created."""
+        return self.network_backend.connections_opened
+
+    def get(self, url, **kwargs) -> httpx.Response:
+        """Send a GET request, with the same arguments as ``httpx.get``."""
+        return self._run(self.client.get(url, **kwargs))
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
@@ -0,0 +1,137 @@
+import csv
+import gzip
+import io
+import json
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+try:
+    import zstandard
+
+    ZSTD = True
+except ImportError:
+    ZSTD = False
+
+COMPRESSIONS = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+Record = Tuple[str, Optional[str]]
+
+
+def open_input(path: Union[Path, str]):
+    """Open an input file as text, transparently decompressing it.
+
+    Compression is inferred from the file extension: ``.gz`` files are
+    read with gzip and ``.zst`` files with zstandard.
+    """
+    path = Path(path)
+    compression = COMPRESSIONS.get(path.suffix.lower())
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        if not ZSTD:
+            raise ImportError(
+                "Cannot read zstd compressed files. "
+                "If you want to proceed, please install zstandard"
+            )
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def infer_format(path: Union[Path, str]) -> str:
+    """Infer input format (txt, csv or jsonl) from the file extension."""
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSIONS:
+        suffixes = suffixes[:-1]
+    return FORMATS.get(suffixes[-1], "txt") if suffixes else "txt"
+
+
+def read_records(
+    path: Union[Path, str],
+    fmt: str = "auto",
+    url_column: str = "url",
+    path_column: str = "path",
+) -> Iterator[Record]:
+    """Stream ``(url, path)`` records from an input file.
+
+    The file is read lazily, so arbitrarily large inputs can be consumed
+    without holding them in memory.
+
+    Parameters
+    ----------
+    path : Path | str
+        Input file. It can be gzip (``.gz``) or zstd (``.zst``) compressed
+    fmt : str
+        One of ``txt``, ``csv``, ``jsonl`` or ``auto``. With ``auto`` the
+        format is inferred from the file extension
+    url_column : str
+        Column (csv) or key (jsonl) holding the url. Csv files without
+        header are accepted when their first column holds urls
+    path_column : str
+        Optional column (csv) or key (jsonl) holding the path where the
+        image should be stored
+
+    Yields
+    ------
+    record : tuple
+        ``(url, path)`` pairs. ``path`` is None when not given
+
+    Raises
+    ------
+    ValueError
+        If a csv file has a header without ``url_column``
+    """
+    if fmt == "auto":
+        fmt = infer_format(path)
+    readers = {"txt": _read_txt, "csv": _read_csv, "jsonl": _read_jsonl}
+    if fmt not in readers:
+        raise ValueError(f"Unknown input format {fmt!r}")
+
+    with open_input(path) as f:
+        yield from readers[fmt](f, url_column=url_column, path_column=path_column)
+
+
+def _read_txt(f, **kwargs) -> Iterator[Record]:
+    for line in f:
+        for url in line.split():
+            yield url, None
+
+
+def _read_csv(f, url_column, path_column) -> Iterator[Record]:
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    if url_column in header:
+        url_idx = header.index(url_column)
+        path_idx = header.index(path_column) if path_column in header else None
+        rows = reader
+    elif header and "://" in header[0]:
+        # Headerless file: urls on the first column and optional paths on
+        # the second one
+        url_idx, path_idx = 0, 1
+        rows = chain([header], reader)
+    else:
+        raise ValueError(f"Column {url_column!r} not found in header {header}")
+
+    for row in rows:
+        if len(row) <= url_idx or not row[url_idx].strip():
+            continue
+        path = None
+        if path_idx is not None and len(row) > path_idx:
+            path = row[path_idx].strip() or None
+        yield row[url_idx].strip(), path
+
+
+def _read_jsonl(f, url_column, path_column) -> Iterator[Record]:
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        yield record[url_column], record.get(path_column) or None
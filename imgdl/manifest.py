@@ -0,0 +1,45 @@
+import json
+import threading
+from pathlib import Path
+from typing import Union
+
+
+class Manifest:
+    """Thread safe JSON lines file with one record per processed image.
+
+    Records are appended, so a resumed job keeps adding to the manifest of
+    the previous run.
+
+    Parameters
+    ----------
+    path : Path | str
+        File where the records are written
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        self.path = Path(path)
+        self._file = open(self.path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_manifest(path: Union[Path, str]):
+    """Yield the records of a manifest."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
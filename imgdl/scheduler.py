@@ -0,0 +1,210 @@
+import threading
+from dataclasses import dataclass, field
+from itertools import count
+from time import monotonic
+from typing import Callable, List, Optional, Tuple
+
+_batch_ids = count()
+
+
+@dataclass(eq=False)
+class Batch:
+    """Group of images submitted together to a :class:`Scheduler`.
+
+    Parameters
+    ----------
+    urls : list
+        urls to be downloaded
+    paths : list
+        paths where the images should be stored. None entries let the
+        storage backend choose
+    force : bool
+        If True force the download even if the files already exists
+    priority : float
+        Weight of the batch. Concurrent batches share the workers in
+        proportion to their priority
+    deadline : float
+        Optional number of seconds, counted from submission. The batch is
+        served ahead of the others when it would otherwise miss it, and
+        its images that have not started when it expires are dropped
+    callback : callable
+        Called as ``callback(i, url, path)`` from the worker thread each
+        time the i-th image is processed. ``path`` is None on failure
+    """
+
+    urls: List[str]
+    paths: List[Optional[str]]
+    force: bool = False
+    priority: float = 1.0
+    deadline: Optional[float] = None
+    callback: Optional[Callable] = None
+
+    def __post_init__(self):
+        if self.priority <= 0:
+            raise ValueError("priority should be strictly positive")
+        if len(self.paths) != len(self.urls):
+            raise ValueError("urls and paths should have the same length")
+        self.id = next(_batch_ids)
+        self.expires_at = None
+        if self.deadline is not None:
+            self.expires_at = monotonic() + self.deadline
+        self.results = [None] * len(self.urls)
+        self.n_fail = 0
+        # Index of the next image to schedule and virtual time of the batch
+        # in the scheduler. Both are guarded by the scheduler lock
+        self.next = 0
+        self.vtime = 0.0
+        self._pending = len(self.urls)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if self._pending == 0:
+            self._done.set()
+
+    @property
+    def remaining(self) -> int:
+        return len(self.urls) - self.next
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> List[Optional[str]]:
+        """Wait for the batch to be processed and return the image paths."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Batch not finished after {timeout} seconds")
+        return self.results
+
+    def set_result(self, i: int, path: Optional[str]):
+        """Record the outcome of the i-th image of the batch."""
+        with self._lock:
+            self.results[i] = path
+            if path is None:
+                self.n_fail += 1
+            self._pending -= 1
+            finished = self._pending == 0
+        try:
+            if self.callback is not None:
+                self.callback(i, self.urls[i], path)
+        finally:
+            if finished:
+                self._done.set()
+
+
+@dataclass
+class Scheduler:
+    """Hand out the images of concurrent batches to a pool of workers.
+
+    Batches share the workers in proportion to their priority (weighted
+    fair queueing): every scheduled image advances the virtual time of its
+    batch by ``1 / priority`` and the next image comes from the batch with
+    the lowest virtual time. New batches start at the current virtual
+    time, so a small urgent batch is not stuck behind a large backfill
+    submitted before it.
+
+    A batch with a deadline only jumps ahead when it is at risk, i.e. when
+    its remaining images would not be done in time at its fair share of
+    the observed throughput. Batches at risk are served earliest deadline
+    first.
+
+    Attributes
+    ----------
+    rate : float
+        Estimated number of images dispatched per second, or None until
+        it has been measured
+    """
+
+    batches: List[Batch] = field(default_factory=list)
+    rate: Optional[float] = None
+    rate_window: float = 1.0
+
+    def __post_init__(self):
+        self._cond = threading.Condition()
+        self._closed = False
+        self._window_start = None
+        self._window_count = 0
+
+    def submit(self, batch: Batch) -> Batch:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed scheduler")
+            if batch.remaining > 0:
+                if not self.batches:
+                    # Throughput is only measured while there is work to do
+                    self._window_start = None
+                    self._window_count = 0
+                batch.vtime = min((b.vtime for b in self.batches), default=0.0)
+                self.batches.append(batch)
+                self._cond.notify_all()
+        return batch
+
+    def get(self) -> Optional[Tuple[Batch, int]]:
+        """Block until an image is available and return ``(batch, i)``.
+
+        Returns None once the scheduler is closed and every batch has
+        been scheduled.
+        """
+        while True:
+            expired = []
+            with self._cond:
+                while not self.batches and not self._closed:
+                    self._cond.wait()
+                if not self.batches:
+                    return None
+
+                now = monotonic()
+                for batch in [b for b in self.batches if b.expired(now)]:
+                    expired.append((batch, range(batch.next, len(batch.urls))))
+                    batch.next = len(batch.urls)
+                    self.batches.remove(batch)
+
+                task = None
+                if self.batches:
+                    total_priority = sum(b.priority for b in self.batches)
+                    batch = min(
+                        self.batches,
+                        key=lambda b: self._rank(b, now, total_priority),
+                    )
+                    task = (batch, batch.next)
+                    batch.next += 1
+                    batch.vtime += 1 / batch.priority
+                    if batch.remaining == 0:
+                        self.batches.remove(batch)
+                    self._update_rate(now)
+
+            for batch, indices in expired:
+                for i in indices:
+                    batch.set_result(i, None)
+
+            if task is not None:
+                return task
+
+    def close(self):
+        """Stop accepting batches and release idle workers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def at_risk(self, batch: Batch, now: float, total_priority: float) -> bool:
+        """Whether the batch would miss its deadline at its fair share."""
+        if batch.expires_at is None or not self.rate:
+            return False
+        share = self.rate * batch.priority / total_priority
+        return batch.remaining / share >= batch.expires_at - now
+
+    def _rank(self, batch: Batch, now: float, total_priority: float):
+        if self.at_risk(batch, now, total_priority):
+            return (0, batch.expires_at, batch.id)
+        return (1, batch.vtime, batch.id)
+
+    def _update_rate(self, now: float):
+        if self._window_start is None:
+            self._window_start = now
+        self._window_count += 1
+        elapsed = now - self._window_start
+        if elapsed > 0 and elapsed >= self.rate_window:
+            rate = self._window_count / elapsed
+            self.rate = rate if self.rate is None else (self.rate + rate) / 2
+            self._window_start = now
+            self._window_count = 0
@@ -6,6 +6,7 @@ class BaseStorage:
         raise NotImplementedError
 
     def save(self, img, path):
+        """Store the image and return the ``format`` and ``bytes`` written."""
         raise NotImplementedError
 
     def get_filepath(self, url):
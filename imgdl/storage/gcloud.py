@@ -29,6 +29,7 @@ class GoogleStorage(BaseStorage):
         img.save(buffer, format="JPEG")
         blob = self.bucket.blob(path)
         blob.upload_from_string(buffer.getvalue(), content_type="image/jpg")
+        return {"format": "JPEG", "bytes": buffer.getbuffer().nbytes}
 
     def get_filepath(self, url):
         return self.bucket_path + self.get_filename(url)
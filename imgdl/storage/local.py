@@ -19,6 +19,10 @@ class LocalStorage(BaseStorage):
 
     def save(self, img: Image.Image, path: Path):
         img.save(path)
+        return {
+            "format": Image.registered_extensions()[Path(path).suffix.lower()],
+            "bytes": Path(path).stat().st_size,
+        }
 
     def get_filepath(self, url):
         return self.store_path / self.get_filename(url)
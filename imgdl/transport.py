@@ -0,0 +1,66 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from .settings import config
+
+try:
+    from .http2 import HTTP2Session
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class HTTPSession(requests.Session):
+    """HTTP/1.1 session with a connection pool sized for the workers.
+
+    ``requests`` keeps at most 10 connections alive per host. With more
+    workers than that, connections are dropped after each download and a
+    new TCP/TLS connection has to be opened for the next one.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of simultaneous threads that will share the session
+    """
+
+    def __init__(self, n_workers: int = config.N_WORKERS):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=n_workers, pool_maxsize=n_workers)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    @property
+    def connections_opened(self) -> int:
+        """Number of connections opened since the session was created."""
+        return count_connections(self)
+
+
+def count_connections(session: requests.Session) -> int:
+    """Number of connections opened by a ``requests`` session."""
+    n_connections = 0
+    for adapter in set(session.adapters.values()):
+        for key in adapter.poolmanager.pools.keys():
+            n_connections += adapter.poolmanager.pools[key].num_connections
+    return n_connections
+
+
+def resolve_session(http2: bool = False, n_workers: int = config.N_WORKERS):
+    """Create the session used to download images.
+
+    Parameters
+    ----------
+    http2 : bool
+        If True use the HTTP/2 transport, otherwise plain ``requests``
+    n_workers : int
+        Number of simultaneous threads that will share the session
+    """
+    if http2:
+        if not HTTP2:
+            raise ImportError(
+                "Cannot use the HTTP/2 transport. "
+                "If you want to proceed, please install httpx[http2]"
+            )
+        return HTTP2Session(n_workers=n_workers)
+
+    return HTTPSession(n_workers=n_workers)
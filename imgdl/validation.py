@@ -0,0 +1,139 @@
+from typing import Collection, Optional, Tuple
+
+from PIL import Image
+
+EXIF_ORIENTATION = 0x0112
+
+
+def _complete_jpeg(content: bytes) -> bool:
+    # The end of image marker must follow the last start of scan. Scan data
+    # cannot contain it, and data appended after it is tolerated
+    return content.find(b"\xff\xd9", max(content.rfind(b"\xff\xda"), 0)) != -1
+
+
+def _complete_png(content: bytes) -> bool:
+    return b"IEND\xaeB`\x82" in content
+
+
+def _skip_sub_blocks(content: bytes, pos: int) -> int:
+    # Data sub-blocks are length prefixed and end with an empty one
+    while pos < len(content) and content[pos]:
+        pos += content[pos] + 1
+    return pos + 1
+
+
+def _complete_gif(content: bytes) -> bool:
+    # Walk the blocks up to the trailer. Its bytes may also appear in the
+    # image data, so searching for them would accept truncated files
+    if len(content) < 13:
+        return False
+    pos = 13
+    if content[10] & 0x80:
+        pos += 3 << ((content[10] & 0x07) + 1)
+    while pos < len(content):
+        block = content[pos]
+        if block == 0x3B:
+            return True
+        if block == 0x21:
+            pos = _skip_sub_blocks(content, pos + 2)
+        elif block == 0x2C:
+            if pos + 10 > len(content):
+                return False
+            flags = content[pos + 9]
+            pos += 10
+            if flags & 0x80:
+                pos += 3 << ((flags & 0x07) + 1)
+            pos = _skip_sub_blocks(content, pos + 1)
+        else:
+            return False
+    return False
+
+
+# Structural checks used to detect truncated downloads
+COMPLETENESS_CHECKS = {
+    "JPEG": _complete_jpeg,
+    "PNG": _complete_png,
+    "GIF": _complete_gif,
+}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def inspect_image(img: Image.Image, content: bytes) -> dict:
+    """Extract image metadata from the header, without decoding pixels.
+
+    Parameters
+    ----------
+    img : Pil.Image
+        Image as returned by ``Image.open``, before it is loaded
+    content : bytes
+        Raw bytes of the image
+
+    Returns
+    -------
+    info : dict
+        Format, mode, width, height, size in bytes and EXIF orientation.
+        Width and height are given as displayed, i.e. swapped when the
+        EXIF orientation rotates the image by 90 degrees
+    """
+    # PNG files may store EXIF after the image data, so reading it when it
+    # is not in the header would decode the whole image
+    if img.format == "PNG" and "exif" not in img.info:
+        orientation = 1
+    else:
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    width, height = img.size
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+
+    return {
+        "format": img.format,
+        "mode": img.mode,
+        "width": width,
+        "height": height,
+        "bytes": len(content),
+        "orientation": orientation,
+    }
+
+
+def validate_image(
+    info: dict,
+    content: bytes,
+    min_size: Optional[Tuple[int, int]] = None,
+    formats: Optional[Collection[str]] = None,
+):
+    """Reject images before any decoding or conversion happens.
+
+    Parameters
+    ----------
+    info : dict
+        Metadata returned by :func:`inspect_image`
+    content : bytes
+        Raw bytes of the image
+    min_size : tuple
+        Minimum ``(width, height)`` of the image
+    formats : list
+        Allowed PIL formats, case insensitive, e.g. ``["JPEG", "PNG"]``.
+        All formats are allowed if None
+
+    Raises
+    ------
+    InvalidImage
+        If the image is truncated, too small or has a format not allowed
+    """
+    if formats is not None and info["format"] not in {f.upper() for f in formats}:
+        raise InvalidImage(f"Format {info['format']} is not allowed")
+
+    if min_size is not None:
+        min_width, min_height = min_size
+        if info["width"] < min_width or info["height"] < min_height:
+            raise InvalidImage(
+                f"Image of size {info['width']}x{info['height']} is smaller "
+                f"than {min_width}x{min_height}"
+            )
+
+    is_complete = COMPLETENESS_CHECKS.get(info["format"])
+    if is_complete is not None and not is_complete(content):
+        raise InvalidImage(f"Truncated {info['format']} image")
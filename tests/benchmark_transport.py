@@ -0,0 +1,69 @@
+"""Compare the connections opened by each transport on local servers.
+
+The HTTP/1.1 transports are run against a keep-alive HTTP/1.1 server.
+HTTP2Session is run against both that server (HTTP/1.1 fallback) and an
+h2c server, where downloads are multiplexed over HTTP/2.
+
+Run with ``python -m tests.benchmark_transport``.
+"""
+import argparse
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import requests
+
+from imgdl import download
+from imgdl.transport import HTTP2, HTTPSession, count_connections
+
+from .server import serve_images
+
+
+def benchmark(name, session, urls, n_workers):
+    with TemporaryDirectory() as store_path:
+        start = perf_counter()
+        paths = download(
+            urls, store_path=store_path, n_workers=n_workers, session=session
+        )
+        elapsed = perf_counter() - start
+
+    n_images = len([path for path in paths if path is not None])
+    n_connections = getattr(session, "connections_opened", None)
+    if n_connections is None:
+        n_connections = count_connections(session)
+    print(
+        f"{name:<28} {n_images / elapsed:>10.1f} images/s "
+        f"{1000 * n_connections / len(urls):>10.1f} connections/1000 images"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n_images", type=int, default=2000)
+    parser.add_argument("--n_workers", type=int, default=40)
+    args = parser.parse_args()
+
+    sessions = {
+        "requests.Session (HTTP/1.1)": lambda: requests.Session(),
+        "HTTPSession (HTTP/1.1)": lambda: HTTPSession(n_workers=args.n_workers),
+    }
+    if HTTP2:
+        from imgdl.http2 import HTTP2Session
+
+        sessions["HTTP2Session (HTTP/1.1)"] = lambda: HTTP2Session(
+            n_workers=args.n_workers
+        )
+
+    with serve_images() as base_url:
+        urls = [f"{base_url}/{i}.jpg" for i in range(args.n_images)]
+        for name, make_session in sessions.items():
+            benchmark(name, make_session(), urls, args.n_workers)
+
+    if HTTP2:
+        with serve_images(http2=True) as base_url:
+            urls = [f"{base_url}/{i}.jpg" for i in range(args.n_images)]
+            session = HTTP2Session(n_workers=args.n_workers, http1=False)
+            benchmark("HTTP2Session (HTTP/2, h2c)", session, urls, args.n_workers)
+
+
+if __name__ == "__main__":
+    main()
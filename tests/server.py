@@ -0,0 +1,113 @@
+import socket
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from PIL import Image
+
+
+def _jpeg(size=(64, 64), orientation=1):
+    img = Image.new("RGB", size, (255, 0, 0))
+    exif = img.getexif()
+    exif[0x0112] = orientation
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serve the same JPEG image on every path, with keep-alive.
+
+    ``/rotated.jpg`` is a 64x32 JPEG with EXIF orientation 6.
+    """
+
+    protocol_version = "HTTP/1.1"
+    image = _jpeg()
+    rotated = _jpeg((64, 32), orientation=6)
+
+    def do_GET(self):
+        image = self.rotated if self.path == "/rotated.jpg" else self.image
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(image)))
+        self.end_headers()
+        self.wfile.write(image)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve_h2_connection(conn, image):
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    h2_conn = h2.connection.H2Connection(
+        config=h2.config.H2Configuration(client_side=False)
+    )
+    h2_conn.initiate_connection()
+    conn.sendall(h2_conn.data_to_send())
+    with conn:
+        while data := conn.recv(65535):
+            for event in h2_conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    headers = [
+                        (":status", "200"),
+                        ("content-type", "image/jpeg"),
+                        ("content-length", str(len(image))),
+                    ]
+                    h2_conn.send_headers(event.stream_id, headers)
+                    # Images are small enough for the initial flow control window
+                    h2_conn.send_data(event.stream_id, image, end_stream=True)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            conn.sendall(h2_conn.data_to_send())
+
+
+class H2ImageServer:
+    """Serve the same JPEG image on every path over h2c (HTTP/2 without TLS)."""
+
+    def __init__(self, image=ImageHandler.image):
+        self.image = image
+        self.sock = socket.create_server(("localhost", 0))
+        self.server_address = self.sock.getsockname()
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=_serve_h2_connection, args=(conn, self.image), daemon=True
+            ).start()
+
+    def shutdown(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def server_close(self):
+        self.sock.close()
+
+
+@contextmanager
+def serve_images(http2=False):
+    """Run a local image server and yield its base url.
+
+    With ``http2=True`` the server only speaks HTTP/2 with prior knowledge.
+    """
+    if http2:
+        server = H2ImageServer()
+    else:
+        server = ThreadingHTTPServer(("localhost", 0), ImageHandler)
+        server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://localhost:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
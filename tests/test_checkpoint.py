@@ -0,0 +1,52 @@
+from imgdl.checkpoint import Checkpoint
+
+
+class TestCheckpoint:
+    def test_offset_advances_over_contiguous_records(self, tmp_path):
+        checkpoint = Checkpoint(path=tmp_path / "checkpoint.json")
+        checkpoint.mark(1, "url1")
+        assert checkpoint.offset == 0
+        assert checkpoint.done == {1}
+        checkpoint.mark(0, "url0")
+        assert checkpoint.offset == 2
+        assert checkpoint.done == set()
+        assert checkpoint.is_done(1)
+        assert not checkpoint.is_done(2)
+
+    def test_failures_are_recorded(self, tmp_path):
+        checkpoint = Checkpoint(path=tmp_path / "checkpoint.json")
+        checkpoint.mark(0, "url0", success=False)
+        checkpoint.mark(0, "url0", success=False)
+        assert checkpoint.offset == 1
+        assert checkpoint.n_failed == 1
+        assert list(checkpoint.failures()) == [{"index": 0, "url": "url0"}]
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        checkpoint = Checkpoint(path=path, source="urls.txt")
+        checkpoint.mark(0, "url0")
+        checkpoint.mark(2, "url2", success=False)
+        checkpoint.save()
+        assert not path.with_name(path.name + ".tmp").exists()
+
+        loaded = Checkpoint.load(path)
+        assert loaded == checkpoint
+        assert "url2" not in path.read_text()
+        assert list(loaded.failures()) == [{"index": 2, "url": "url2"}]
+
+    def test_failures_are_appended(self, tmp_path):
+        checkpoint = Checkpoint(path=tmp_path / "checkpoint.json")
+        checkpoint.mark(0, "url0", success=False)
+        checkpoint.save()
+        checkpoint.mark(1, "url1", success=False)
+        checkpoint.save()
+        checkpoint.save()
+        assert [f["url"] for f in checkpoint.failures()] == ["url0", "url1"]
+
+        checkpoint.clear()
+        assert list(checkpoint.failures()) == []
+
+    def test_load_missing_file(self, tmp_path):
+        checkpoint = Checkpoint.load(tmp_path / "checkpoint.json")
+        assert checkpoint.offset == 0
+        assert checkpoint.source is None
@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+import pytest
+
+from imgdl import cli
+from imgdl.checkpoint import Checkpoint
+from imgdl.manifest import read_manifest
+
+from .server import serve_images
+
+URLS = [f"http://www.fake.image_url{i}.png" for i in range(5)]
+
+
+@pytest.fixture
+def urls_file(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("\n".join(URLS))
+    return path
+
+
+def test_main_writes_checkpoint(tmp_path, urls_file):
+    cli.main([str(urls_file), "-o", str(tmp_path / "images"), "--chunk_size", "2"])
+
+    checkpoint = Checkpoint.load(f"{urls_file}.checkpoint.json")
+    assert checkpoint.offset == len(URLS)
+    assert checkpoint.n_failed == len(URLS)
+    assert sorted(failure["url"] for failure in checkpoint.failures()) == URLS
+
+
+def test_main_resume_skips_processed_urls(tmp_path, urls_file):
+    checkpoint = Checkpoint(
+        path=f"{urls_file}.checkpoint.json", source=str(urls_file.resolve())
+    )
+    for i in [0, 1, 3]:
+        checkpoint.mark(i, URLS[i])
+    checkpoint.save()
+
+    with patch("imgdl.cli.ImageDownloader.__call__") as mock_call:
+        cli.main([str(urls_file), "-o", str(tmp_path / "images"), "--resume"])
+    submitted = [url for call in mock_call.call_args_list for url in call.args[0]]
+    assert submitted == [URLS[2], URLS[4]]
+
+
+def test_main_resume_rejects_other_input(tmp_path, urls_file):
+    Checkpoint(path=f"{urls_file}.checkpoint.json", source="other.txt").save()
+    with pytest.raises(ValueError):
+        cli.main([str(urls_file), "-o", str(tmp_path / "images"), "--resume"])
+
+
+def test_main_validation_and_manifest(tmp_path):
+    urls_file = tmp_path / "urls.jsonl"
+    manifest = tmp_path / "manifest.jsonl"
+    with serve_images() as base_url:
+        urls_file.write_text(f'{{"url": "{base_url}/0.jpg"}}\n')
+        cli.main(
+            [
+                str(urls_file),
+                "-o",
+                str(tmp_path / "images"),
+                "--manifest",
+                str(manifest),
+            ]
+            + ["--min_size", "32", "32", "--formats", "jpeg"]
+        )
+
+    (record,) = read_manifest(manifest)
+    assert record["success"]
+    assert (record["width"], record["height"], record["format"]) == (64, 64, "JPEG")
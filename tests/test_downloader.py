@@ -2,8 +2,15 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import pytest
+from PIL import Image
 
-from imgdl import download
+from imgdl import DownloaderService, download
+from imgdl.downloader import ImageDownloader
+from imgdl.manifest import read_manifest
+from imgdl.transport import HTTPSession
+from imgdl.validation import InvalidImage
+
+from .server import serve_images
 
 images_file = Path(__file__).parent / "wikimedia.csv"
 
@@ -59,3 +66,98 @@ def test_call_generator():
     paths = download(iterator())
 
     assert len(paths) == 3, "Expected a list of Nones of length 3"
+
+
+def test_service_download_concurrent_batches():
+    with DownloaderService(ImageDownloader(n_workers=2, timeout=1)) as service:
+        bulk = service.submit([f"http://www.fake.image_url{i}.png" for i in range(5)])
+        paths = service.download(["http://www.fake.image_url.png"], priority=10)
+        assert paths == [None]
+        assert bulk.result(timeout=60) == [None] * 5
+
+
+def test_download_writes_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    with serve_images() as base_url:
+        urls = [f"{base_url}/{i}.jpg" for i in range(3)]
+        paths = download(urls, store_path=tmp_path, manifest=manifest)
+        download(urls[:1], store_path=tmp_path, manifest=manifest)
+
+    records = list(read_manifest(manifest))
+    assert len(records) == 4
+    assert {record["path"] for record in records} == set(paths)
+    for record in records[:3]:
+        assert record["success"] and not record["cached"]
+        assert (record["width"], record["height"]) == (64, 64)
+        assert record["format"] == record["source_format"] == "JPEG"
+        assert record["bytes"] == Path(record["path"]).stat().st_size
+    assert records[3]["cached"]
+
+
+def test_manifest_describes_stored_image(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    with serve_images() as base_url:
+        path = download(
+            f"{base_url}/rotated.jpg",
+            paths=str(tmp_path / "rotated.png"),
+            store_path=tmp_path,
+            manifest=manifest,
+        )
+
+    (record,) = read_manifest(manifest)
+    with Image.open(path) as img:
+        assert (record["width"], record["height"]) == img.size
+        assert record["format"] == img.format == "PNG"
+    assert record["bytes"] == Path(path).stat().st_size
+    assert (record["source_width"], record["source_height"]) == (32, 64)
+    assert record["source_format"] == "JPEG"
+    assert record["source_orientation"] == 6
+
+
+def test_download_rejects_invalid_images(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    with serve_images() as base_url:
+        paths = download(
+            [f"{base_url}/small.jpg", f"{base_url}/other.jpg"],
+            paths=[str(tmp_path / "small.jpg"), str(tmp_path / "other.jpg")],
+            store_path=tmp_path,
+            min_size=(100, 100),
+            manifest=manifest,
+        )
+        with pytest.raises(InvalidImage):
+            download(f"{base_url}/png.jpg", store_path=tmp_path, formats=["PNG"])
+
+    assert paths == [None, None]
+    assert not (tmp_path / "small.jpg").exists()
+    records = list(read_manifest(manifest))
+    assert [record["success"] for record in records] == [False, False]
+    assert all(record["source_width"] == 64 for record in records)
+    assert not any("width" in record for record in records)
+
+
+def test_service_rejects_single_url():
+    with DownloaderService(ImageDownloader(n_workers=1)) as service:
+        with pytest.raises(ValueError):
+            service.download("http://www.fake.image_url.png")
+        with pytest.raises(ValueError):
+            service.submit("http://www.fake.image_url.png")
+
+
+def test_service_survives_failing_callback():
+    def callback(i, url, path):
+        raise RuntimeError("callback failed")
+
+    with DownloaderService(ImageDownloader(n_workers=1)) as service:
+        urls = ["http://www.fake.image_url1.png", "http://www.fake.image_url2.png"]
+        batch = service.submit(urls, callback=callback)
+        assert batch.result(timeout=30) == [None, None]
+        assert all(worker.is_alive() for worker in service.workers)
+        assert service.download(urls[:1]) == [None]
+
+
+def test_service_default_session_sized_for_workers():
+    with DownloaderService() as service:
+        session = service.downloader.session
+        assert isinstance(session, HTTPSession)
+        adapter = session.get_adapter("https://")
+        assert adapter._pool_maxsize == service.downloader.n_workers
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import pytest
+
+from imgdl import inputs
+
+URLS = [
+    "http://www.fake.image_url1.png",
+    "http://www.fake.image_url2.png",
+    "http://www.fake.image_url3.png",
+]
+
+
+class TestReadRecords:
+    def test_txt(self, tmp_path):
+        path = tmp_path / "urls.txt"
+        path.write_text("\n".join(URLS) + "\n")
+        assert list(inputs.read_records(path)) == [(url, None) for url in URLS]
+
+    def test_gzip_txt(self, tmp_path):
+        path = tmp_path / "urls.txt.gz"
+        with gzip.open(path, "wt") as f:
+            f.write("\n".join(URLS))
+        assert list(inputs.read_records(path)) == [(url, None) for url in URLS]
+
+    def test_csv_with_header(self, tmp_path):
+        path = tmp_path / "urls.csv"
+        path.write_text("id,url,path\n1,{},a.jpg\n2,{},\n".format(*URLS[:2]))
+        assert list(inputs.read_records(path)) == [
+            (URLS[0], "a.jpg"),
+            (URLS[1], None),
+        ]
+
+    def test_csv_without_header(self, tmp_path):
+        path = tmp_path / "urls.csv"
+        path.write_text("\n".join(URLS) + "\n")
+        assert list(inputs.read_records(path)) == [(url, None) for url in URLS]
+
+    def test_csv_missing_url_column(self, tmp_path):
+        path = tmp_path / "urls.csv"
+        path.write_text("image_url,dest\n{},a.jpg\n".format(URLS[0]))
+        with pytest.raises(ValueError):
+            list(inputs.read_records(path, url_column="src"))
+
+    def test_gzip_jsonl_with_custom_columns(self, tmp_path):
+        path = tmp_path / "urls.jsonl.gz"
+        with gzip.open(path, "wt") as f:
+            for i, url in enumerate(URLS):
+                f.write(json.dumps({"src": url, "dst": f"{i}.jpg"}) + "\n")
+        records = inputs.read_records(path, url_column="src", path_column="dst")
+        assert list(records) == [(url, f"{i}.jpg") for i, url in enumerate(URLS)]
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / "urls.txt"
+        path.write_text(URLS[0])
+        with pytest.raises(ValueError):
+            list(inputs.read_records(path, fmt="parquet"))
+
+    def test_multi_frame_zstd(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        path = tmp_path / "urls.txt.zst"
+        compressor = zstandard.ZstdCompressor()
+        path.write_bytes(
+            b"".join(compressor.compress(f"{url}\n".encode()) for url in URLS)
+        )
+        assert list(inputs.read_records(path)) == [(url, None) for url in URLS]
+
+    def test_zstd_without_zstandard_installed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(inputs, "ZSTD", False)
+        path = tmp_path / "urls.txt.zst"
+        path.write_bytes(b"")
+        with pytest.raises(ImportError):
+            list(inputs.read_records(path))
@@ -0,0 +1,135 @@
+import threading
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+
+from imgdl.scheduler import Batch, Scheduler
+
+
+def make_batch(n, **kwargs):
+    return Batch(urls=[f"url{i}" for i in range(n)], paths=[None] * n, **kwargs)
+
+
+def drain(scheduler, n):
+    tasks = []
+    for _ in range(n):
+        batch, i = scheduler.get()
+        batch.set_result(i, f"path{i}")
+        tasks.append((batch, i))
+    return tasks
+
+
+class TestBatch:
+    def test_result(self):
+        batch = make_batch(2)
+        batch.set_result(0, "path0")
+        assert not batch.done()
+        batch.set_result(1, None)
+        assert batch.result(timeout=0) == ["path0", None]
+        assert batch.n_fail == 1
+
+    def test_failing_callback_still_sets_result(self):
+        def callback(i, url, path):
+            raise RuntimeError("callback failed")
+
+        batch = make_batch(1, callback=callback)
+        with pytest.raises(RuntimeError):
+            batch.set_result(0, "path0")
+        assert batch.result(timeout=0) == ["path0"]
+
+    def test_empty_batch_is_done(self):
+        assert make_batch(0).result(timeout=0) == []
+
+    def test_result_timeout(self):
+        with pytest.raises(TimeoutError):
+            make_batch(1).result(timeout=0)
+
+    def test_invalid_priority(self):
+        with pytest.raises(ValueError):
+            make_batch(1, priority=0)
+
+
+class TestScheduler:
+    def test_fifo_within_a_batch(self):
+        scheduler = Scheduler()
+        batch = scheduler.submit(make_batch(3))
+        assert [i for _, i in drain(scheduler, 3)] == [0, 1, 2]
+        assert batch.result(timeout=0) == ["path0", "path1", "path2"]
+
+    def test_new_batch_is_not_stuck_behind_backfill(self):
+        scheduler = Scheduler()
+        backfill = scheduler.submit(make_batch(100))
+        drain(scheduler, 10)
+        urgent = scheduler.submit(make_batch(4, priority=3))
+        served = [batch for batch, _ in drain(scheduler, 8)]
+        assert served.count(urgent) == 4
+        assert urgent.done()
+        assert not backfill.done()
+
+    def test_workers_shared_by_priority(self):
+        scheduler = Scheduler()
+        low = scheduler.submit(make_batch(100, priority=1))
+        high = scheduler.submit(make_batch(100, priority=3))
+        served = [batch for batch, _ in drain(scheduler, 40)]
+        assert served.count(high) == 30
+        assert served.count(low) == 10
+
+    def test_deadline_batches_at_risk_first(self):
+        scheduler = Scheduler(rate=1.0)
+        scheduler.submit(make_batch(10, priority=100))
+        late = scheduler.submit(make_batch(2, deadline=60))
+        early = scheduler.submit(make_batch(2, deadline=30))
+        served = [batch for batch, _ in drain(scheduler, 4)]
+        assert served == [early, early, late, late]
+
+    def test_long_deadline_does_not_block_priority(self):
+        scheduler = Scheduler(rate=1000.0)
+        bulk = scheduler.submit(make_batch(1000, deadline=86400))
+        urgent = scheduler.submit(make_batch(20, priority=100))
+        served = [batch for batch, _ in drain(scheduler, 20)]
+        assert served.count(urgent) >= 19
+        assert not scheduler.at_risk(bulk, monotonic(), 101)
+
+    def test_rate_is_measured(self):
+        scheduler = Scheduler(rate_window=0)
+        scheduler.submit(make_batch(1000))
+        drain(scheduler, 1000)
+        assert scheduler.rate > 0
+
+    def test_idle_time_is_not_measured(self):
+        clock = [0.0]
+
+        def drain_at_100_per_second(n):
+            for _ in range(n):
+                assert scheduler.get() is not None
+                clock[0] += 0.01
+
+        with patch("imgdl.scheduler.monotonic", lambda: clock[0]):
+            scheduler = Scheduler()
+            scheduler.submit(make_batch(101))
+            drain_at_100_per_second(101)
+            assert scheduler.rate == pytest.approx(100, rel=0.05)
+
+            clock[0] += 600
+            scheduler.submit(make_batch(101))
+            drain_at_100_per_second(101)
+            assert scheduler.rate == pytest.approx(100, rel=0.05)
+
+    def test_expired_batch_is_dropped(self):
+        scheduler = Scheduler()
+        expired = scheduler.submit(make_batch(3, deadline=0))
+        other = scheduler.submit(make_batch(1))
+        assert drain(scheduler, 1) == [(other, 0)]
+        assert expired.result(timeout=0) == [None, None, None]
+
+    def test_close_releases_waiting_workers(self):
+        scheduler = Scheduler()
+        tasks = []
+        worker = threading.Thread(target=lambda: tasks.append(scheduler.get()))
+        worker.start()
+        scheduler.close()
+        worker.join(timeout=1)
+        assert tasks == [None]
+        with pytest.raises(RuntimeError):
+            scheduler.submit(make_batch(1))
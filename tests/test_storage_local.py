@@ -24,6 +24,7 @@ class TestLocalStorage:
     def test_save_and_exists(self, tmp_path):
         s = local.LocalStorage(store_path=tmp_path)
         filepath = s.store_path / "test.jpg"
-        s.save(TEST_IMAGE, filepath)
+        stored = s.save(TEST_IMAGE, filepath)
+        assert stored == {"format": "JPEG", "bytes": filepath.stat().st_size}
         assert filepath.exists()
         assert s.exists(filepath)
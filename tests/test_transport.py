@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+
+from imgdl import download
+from imgdl.transport import HTTPSession, count_connections, resolve_session
+
+from .server import serve_images
+
+N_WORKERS = 4
+N_IMAGES = 40
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    with serve_images() as url:
+        yield url
+
+
+def download_all(base_url, session, tmp_path):
+    urls = [f"{base_url}/{i}.jpg" for i in range(N_IMAGES)]
+    return download(urls, store_path=tmp_path, n_workers=N_WORKERS, session=session)
+
+
+def test_resolve_session():
+    assert isinstance(resolve_session(), HTTPSession)
+
+
+def test_http_session_keeps_connections_alive(base_url, tmp_path):
+    session = HTTPSession(n_workers=N_WORKERS)
+    paths = download_all(base_url, session, tmp_path)
+    assert None not in paths
+    assert 0 < session.connections_opened <= N_WORKERS
+    assert count_connections(session) == session.connections_opened
+
+
+def test_without_httpx_installed():
+    with patch("imgdl.transport.HTTP2", False):
+        with pytest.raises(ImportError):
+            resolve_session(http2=True)
+
+
+class TestHTTP2Session:
+    @pytest.fixture(autouse=True)
+    def http2(self):
+        return pytest.importorskip("imgdl.http2")
+
+    def test_download(self, base_url, tmp_path, http2):
+        with resolve_session(http2=True, n_workers=N_WORKERS) as session:
+            assert isinstance(session, http2.HTTP2Session)
+            paths = download_all(base_url, session, tmp_path)
+            assert None not in paths
+            assert 0 < session.connections_opened <= N_WORKERS
+
+    def test_download_closes_its_own_session(self, base_url, tmp_path, http2):
+        with patch("imgdl.http2.HTTP2Session.close", autospec=True) as close:
+            urls = [f"{base_url}/{i}.jpg" for i in range(N_IMAGES)]
+            download(urls, store_path=tmp_path, n_workers=N_WORKERS, http2=True)
+        assert close.call_count == 1
+
+    def test_multiplexes_over_h2c(self, tmp_path, http2):
+        with http2.HTTP2Session(n_workers=N_WORKERS, http1=False) as session:
+            with serve_images(http2=True) as h2_url:
+                assert session.get(f"{h2_url}/0.jpg").http_version == "HTTP/2"
+                paths = download_all(h2_url, session, tmp_path)
+            assert None not in paths
+            assert session.connections_opened == 1
+
+    def test_maps_connection_errors_to_httpx(self, http2):
+        import httpx
+
+        with http2.HTTP2Session(n_workers=1) as session:
+            with pytest.raises(httpx.ConnectError):
+                session.get("http://localhost:1/image.jpg", timeout=1)
+
+    def test_dns_cache(self, http2):
+        cache = http2.DNSCache(ttl=60)
+        with patch("socket.getaddrinfo", wraps=http2.socket.getaddrinfo) as mock:
+            assert cache.resolve("localhost", 80) == cache.resolve("localhost", 80)
+            assert mock.call_count == 1
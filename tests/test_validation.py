@@ -0,0 +1,93 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from imgdl.validation import InvalidImage, inspect_image, validate_image
+
+
+def encode(img, fmt, **kwargs):
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def inspect(content):
+    return inspect_image(Image.open(BytesIO(content)), content)
+
+
+class TestInspectImage:
+    def test_metadata(self):
+        content = encode(Image.new("RGB", (30, 20)), "JPEG")
+        assert inspect(content) == {
+            "format": "JPEG",
+            "mode": "RGB",
+            "width": 30,
+            "height": 20,
+            "bytes": len(content),
+            "orientation": 1,
+        }
+
+    def test_exif_orientation_swaps_dimensions(self):
+        img = Image.new("RGB", (30, 20))
+        exif = img.getexif()
+        exif[0x0112] = 6
+        info = inspect(encode(img, "JPEG", exif=exif))
+        assert info["orientation"] == 6
+        assert (info["width"], info["height"]) == (20, 30)
+
+
+class TestValidateImage:
+    def test_valid(self):
+        content = encode(Image.new("RGBA", (30, 20)), "PNG")
+        validate_image(inspect(content), content, min_size=(30, 20), formats=["PNG"])
+
+    def test_too_small(self):
+        content = encode(Image.new("RGB", (30, 20)), "JPEG")
+        with pytest.raises(InvalidImage):
+            validate_image(inspect(content), content, min_size=(10, 21))
+
+    def test_formats_are_case_insensitive(self):
+        content = encode(Image.new("RGB", (30, 20)), "JPEG")
+        validate_image(inspect(content), content, formats=["jpeg"])
+
+    def test_jpeg_with_data_after_end_marker(self):
+        content = encode(Image.new("RGB", (100, 100)), "JPEG") + b"\x00" * 100
+        validate_image(inspect(content), content)
+
+    def test_jpeg_truncated_after_exif_thumbnail(self):
+        img = Image.effect_noise((300, 200), 50).convert("RGB")
+        thumbnail = encode(Image.new("RGB", (16, 16)), "JPEG")
+        content = encode(img, "JPEG", exif=b"Exif\x00\x00" + thumbnail)
+        truncated = content[: len(content) * 3 // 4]
+        with pytest.raises(InvalidImage):
+            validate_image(inspect(truncated), truncated)
+
+    def test_gif_truncated_at_any_point(self):
+        content = encode(Image.linear_gradient("L").resize((300, 200)), "GIF")
+        for end in range(len(content) - 200, len(content)):
+            with pytest.raises(InvalidImage):
+                validate_image(inspect(content[:end]), content[:end])
+
+    def test_gif_with_data_after_trailer(self):
+        content = encode(Image.linear_gradient("L").resize((300, 200)), "GIF")
+        content += b"\n" + b"\x00" * 100
+        validate_image(inspect(content), content)
+
+    def test_truncated_noise_gif(self):
+        content = encode(Image.effect_noise((300, 200), 50).convert("RGB"), "GIF")
+        for end in range(len(content) - 200, len(content)):
+            with pytest.raises(InvalidImage):
+                validate_image(inspect(content[:end]), content[:end])
+
+    def test_format_not_allowed(self):
+        content = encode(Image.new("RGB", (30, 20)), "GIF")
+        with pytest.raises(InvalidImage):
+            validate_image(inspect(content), content, formats=["JPEG", "PNG"])
+
+    @pytest.mark.parametrize("fmt", ["JPEG", "PNG", "GIF"])
+    def test_truncated(self, fmt):
+        content = encode(Image.effect_noise((300, 200), 50).convert("RGB"), fmt)
+        truncated = content[: len(content) // 2]
+        with pytest.raises(InvalidImage):
+            validate_image(inspect(truncated), truncated)